@@ -1,11 +1,13 @@
 # main.py
-import sys, os, traceback, json
+import sys, os, time, traceback, json
 from datetime import datetime
+try: import orjson # Optional faster JSON codec for the config file
+except ImportError: orjson = None
 
 from PyQt6.QtWidgets import QApplication, QMessageBox, QSplashScreen, QSystemTrayIcon
 # Import QFontDatabase, QFont here
-from PyQt6.QtGui     import QIcon, QPixmap, QFontDatabase, QFont
-from PyQt6.QtCore    import Qt
+from PyQt6.QtGui     import QIcon, QPixmap, QFontDatabase, QFont, QFontInfo
+from PyQt6.QtCore    import Qt, QByteArray, QEventLoop, QTimer
 
 # --- Constants ---
 APP_NAME = "Bulk Email Sender"
@@ -13,36 +15,49 @@ DEFAULT_THEME_FILENAME = "Default.qss"
 # *** Define preferred default fonts ***
 PREFERRED_DEFAULT_FONT = "Roboto" # TRY THIS FIRST (Needs Roboto-Regular.ttf in assets/fonts)
 FALLBACK_DEFAULT_FONT = "Segoe UI" # Fallback if preferred not found/loaded
+DATA_SUBDIRS = ('leads','smtps','subjects','messages', 'attachments','proxies','campaigns','logs', 'config')
 
 # --- Global variables ---
-BASE_PATH = os.path.abspath(os.path.dirname(__file__))
-DATA_DIR = os.path.join(BASE_PATH, 'data')
+_BASE_PATH = None # Resolved once by get_base_path()
 
-# --- Helper Functions ---
 def get_base_path():
-    if getattr(sys, 'frozen', False): return sys._MEIPASS
-    return os.path.abspath(os.path.dirname(__file__))
+    global _BASE_PATH
+    if _BASE_PATH is None: _BASE_PATH = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.abspath(os.path.dirname(__file__))
+    return _BASE_PATH
 
+BASE_PATH = get_base_path()
+DATA_DIR = os.path.join(BASE_PATH, 'data')
+
+# --- Helper Functions ---
 def setup_data_dirs(base):
-    global DATA_DIR; DATA_DIR = os.path.join(base, 'data'); os.makedirs(DATA_DIR, exist_ok=True)
-    for sub in ('leads','smtps','subjects','messages', 'attachments','proxies','campaigns','logs', 'config'):
-        os.makedirs(os.path.join(DATA_DIR, sub), exist_ok=True)
+    global DATA_DIR; DATA_DIR = os.path.join(base, 'data')
+    # One directory listing tells us what already exists; warm starts create nothing
+    try:
+        with os.scandir(DATA_DIR) as it: existing = {e.name for e in it if e.is_dir()}
+    except FileNotFoundError: existing = set()
+    for sub in DATA_SUBDIRS:
+        if sub not in existing: os.makedirs(os.path.join(DATA_DIR, sub), exist_ok=True)
     os.makedirs(os.path.join(base, 'assets', 'themes'), exist_ok=True)
     os.makedirs(os.path.join(base, 'assets', 'fonts'), exist_ok=True) # Still ensure fonts dir exists
 
 def load_fonts(base):
     """ Loads custom fonts from assets/fonts into the application database. """
-    fonts_dir = os.path.join(base, 'assets', 'fonts'); loaded_fonts = 0; total_files = 0
-    print(f"--- Scanning for fonts in: {fonts_dir} ---")
+    fonts_dir = os.path.join(base, 'assets', 'fonts'); loaded = []; failed = []; families = []
     if os.path.isdir(fonts_dir):
-        for f in os.listdir(fonts_dir):
-            if f.lower().endswith(('.ttf','.otf')):
-                total_files += 1; font_path = os.path.join(fonts_dir, f); print(f"Attempting to load font file: {f}")
-                font_id = QFontDatabase.addApplicationFont(font_path)
-                if font_id != -1: loaded_fonts += 1; families = QFontDatabase.applicationFontFamilies(font_id); print(f"  ✅ SUCCESS: Loaded '{f}'. Found Families: {families}")
-                else: print(f"  ❌ FAILED: Could not load font file '{f}'. Check if valid.")
+        with os.scandir(fonts_dir) as it:
+            for entry in it:
+                if not (entry.is_file() and entry.name.lower().endswith(('.ttf','.otf'))): continue
+                try:
+                    with open(entry.path, 'rb') as fh: font_id = QFontDatabase.addApplicationFontFromData(QByteArray(fh.read()))
+                except OSError: font_id = -1
+                if font_id != -1:
+                    loaded.append(entry.name)
+                    for family in QFontDatabase.applicationFontFamilies(font_id):
+                        if family not in families: families.append(family)
+                else: failed.append(entry.name)
+        # One summary line for the whole scan instead of a line per font file
+        print(f"--- Fonts in {fonts_dir}: {len(loaded)} loaded ({', '.join(families) or 'none'})" + (f"; ❌ FAILED: {', '.join(failed)}. Check if valid." if failed else "") + " ---")
     else: print(f"Font directory not found: {fonts_dir}")
-    print(f"--- Font Scan Complete: {loaded_fonts} loaded ---")
 
 def get_config_path(base):
     return os.path.join(DATA_DIR, 'config', 'settings.json')
@@ -51,8 +66,9 @@ def load_config(config_path):
     """ Loads config, removes old 'default_font' key if present. """
     if os.path.exists(config_path):
         try:
-            with open(config_path, 'r', encoding='utf-8') as f: data = json.load(f)
-            if 'default_font' in data:
+            with open(config_path, 'rb') as f: raw = f.read()
+            data = orjson.loads(raw) if orjson else json.loads(raw)
+            if 'default_font' in data: # One-time migration; later starts skip the write
                 print("Removing obsolete 'default_font' from config.")
                 del data['default_font']
                 save_config(config_path, data) # Save cleaned config
@@ -61,33 +77,53 @@ def load_config(config_path):
     return {}
 
 def save_config(config_path, config_data):
-    """ Saves config, ensures 'default_font' key is removed. """
+    """ Saves config. Callers pass data already cleaned by load_config. """
     try:
-        config_data.pop('default_font', None); os.makedirs(os.path.dirname(config_path), exist_ok=True)
-        with open(config_path, 'w', encoding='utf-8') as f: json.dump(config_data, f, indent=4)
+        os.makedirs(os.path.dirname(config_path), exist_ok=True)
+        if orjson:
+            with open(config_path, 'wb') as f: f.write(orjson.dumps(config_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(config_path, 'w', encoding='utf-8') as f: json.dump(config_data, f, indent=2, ensure_ascii=False) # Same layout as orjson's OPT_INDENT_2
     except Exception as e: print(f"E: Saving config {config_path}: {e}")
 
 def load_and_apply_theme(app, base_path, config):
     themes_dir = os.path.join(base_path, 'assets', 'themes'); config_path = get_config_path(base_path)
     theme_filename = config.get('default_theme', DEFAULT_THEME_FILENAME); theme_path = os.path.join(themes_dir, theme_filename)
-    if not os.path.exists(theme_path):
-        print(f"W: Saved theme '{theme_filename}' missing. Falling back.")
-        theme_filename = DEFAULT_THEME_FILENAME; theme_path = os.path.join(themes_dir, theme_filename)
-        config['default_theme'] = theme_filename; save_config(config_path, config)
-    if not os.path.exists(theme_path): print(f"W: Default theme missing. No theme."); app.setStyleSheet(""); return ""
     try:
-        with open(theme_path, 'r', encoding='utf-8') as f: qss = f.read()
+        try: # Open directly instead of probing with os.path.exists first
+            with open(theme_path, 'r', encoding='utf-8') as f: qss = f.read()
+        except FileNotFoundError:
+            print(f"W: Saved theme '{theme_filename}' missing. Falling back.")
+            theme_filename = DEFAULT_THEME_FILENAME; theme_path = os.path.join(themes_dir, theme_filename)
+            config['default_theme'] = theme_filename; save_config(config_path, config)
+            try:
+                with open(theme_path, 'r', encoding='utf-8') as f: qss = f.read()
+            except FileNotFoundError: print(f"W: Default theme missing. No theme."); app.setStyleSheet(""); return ""
         app.setStyleSheet(qss); print(f"Applied theme: {theme_filename}"); return qss
     except Exception as e: print(f"E: Loading theme {theme_path}: {e}"); QMessageBox.warning(None, "Theme Error", f"Could not load theme '{theme_filename}': {e}"); app.setStyleSheet(""); return ""
 
+def setup_tray(app, icon_path, app_style):
+    """ Creates the system tray icon; icon_path is None when the logo could not be loaded. """
+    if not QSystemTrayIcon.isSystemTrayAvailable(): print("W: Sys tray not supported."); app.tray_icon = None; return
+    if icon_path: tray_icon = QIcon(icon_path)
+    else:
+        try: tray_icon = app_style.standardIcon(app_style.StandardPixmap.SP_ComputerIcon)
+        except Exception as style_e: print(f"W: Std tray icon: {style_e}"); tray_icon = QIcon()
+    if tray_icon.isNull(): print("W: Invalid tray icon.")
+    try: tray = QSystemTrayIcon(tray_icon, parent=app); tray.setToolTip(APP_NAME); tray.show(); app.tray_icon = tray
+    except Exception as tray_e: print(f"E: Could not create/show sys tray: {tray_e}"); app.tray_icon = None
+
 # --- Exception Hook ---
 def exception_hook(exc_type, exc_value, exc_tb):
-    log_dir = os.path.join(DATA_DIR, 'logs');
+    log_dir = os.path.join(DATA_DIR, 'logs'); timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S") # One timestamp per exception
     try: os.makedirs(log_dir, exist_ok=True)
-    except Exception as dir_e: print(f"FATAL: No log dir {log_dir}: {dir_e}"); timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S"); error_message = f"Error AND failed log dir:\n\n{exc_type.__name__}: {exc_value}"; print(f"CRITICAL ERROR ({timestamp}): {error_message}"); traceback.print_exception(exc_type, exc_value, exc_tb, file=sys.stderr); sys.exit(1)
-    fn = os.path.join(log_dir, 'error.log'); timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S"); error_message = f"An unexpected error occurred:\n\n{exc_type.__name__}: {exc_value}\n\nSee log file for details:\n{fn}"; print(f"CRITICAL ERROR ({timestamp}): {error_message}")
+    except Exception as dir_e:
+        error_message = f"Error AND failed log dir:\n\n{exc_type.__name__}: {exc_value}" # Report + traceback go out as one stderr write
+        if sys.stderr: sys.stderr.write(f"FATAL: No log dir {log_dir}: {dir_e}\nCRITICAL ERROR ({timestamp}): {error_message}\n" + "".join(traceback.format_exception(exc_type, exc_value, exc_tb))); sys.stderr.flush() # None in windowed frozen builds
+        sys.exit(1)
+    fn = os.path.join(log_dir, 'error.log'); error_message = f"An unexpected error occurred:\n\n{exc_type.__name__}: {exc_value}\n\nSee log file for details:\n{fn}"; print(f"CRITICAL ERROR ({timestamp}): {error_message}")
     try:
-        with open(fn, 'a', encoding='utf-8') as f: f.write(f"\n----- Uncaught Exception ({timestamp}) -----\n"); traceback.print_exception(exc_type, exc_value, exc_tb, file=f); f.write("-----\n")
+        with open(fn, 'a', encoding='utf-8') as f: f.write(f"\n----- Uncaught Exception ({timestamp}) -----\n" + "".join(traceback.format_exception(exc_type, exc_value, exc_tb)) + "-----\n")
     except Exception as log_e: print(f"FATAL: No write log {fn}: {log_e}"); error_message += f"\n\nNo write log: {log_e}"
     app_instance = QApplication.instance()
     if app_instance:
@@ -112,16 +148,18 @@ def main():
     # *** MODIFIED: Set Default Application Font (No Config Check) ***
     print(f"--- Setting Application Font ---")
     font_set = False
-    # 1. Try setting the preferred default (e.g., "Roboto")
-    if PREFERRED_DEFAULT_FONT in QFontDatabase.families():
-        try: print(f"Attempting to set font: '{PREFERRED_DEFAULT_FONT}'"); app.setFont(QFont(PREFERRED_DEFAULT_FONT)); font_set = True; print(f"  ✅ Set font to '{PREFERRED_DEFAULT_FONT}'")
+    # 1. Try setting the preferred default (e.g., "Roboto"); QFontInfo resolves one family without listing them all
+    preferred_font = QFont(PREFERRED_DEFAULT_FONT)
+    if QFontInfo(preferred_font).family() == PREFERRED_DEFAULT_FONT:
+        try: print(f"Attempting to set font: '{PREFERRED_DEFAULT_FONT}'"); app.setFont(preferred_font); font_set = True; print(f"  ✅ Set font to '{PREFERRED_DEFAULT_FONT}'")
         except Exception as e: print(f"  E: Failed setting '{PREFERRED_DEFAULT_FONT}': {e}")
     else: print(f"W: Font '{PREFERRED_DEFAULT_FONT}' not found.")
     # 2. Try fallback if preferred failed
     if not font_set:
         print(f"Attempting fallback: '{FALLBACK_DEFAULT_FONT}'")
         try:
-            if FALLBACK_DEFAULT_FONT in QFontDatabase.families(): app.setFont(QFont(FALLBACK_DEFAULT_FONT)); font_set = True; print(f"  ✅ Set font to fallback '{FALLBACK_DEFAULT_FONT}'")
+            fallback_font = QFont(FALLBACK_DEFAULT_FONT)
+            if QFontInfo(fallback_font).family() == FALLBACK_DEFAULT_FONT: app.setFont(fallback_font); font_set = True; print(f"  ✅ Set font to fallback '{FALLBACK_DEFAULT_FONT}'")
             else: print(f"  W: Fallback '{FALLBACK_DEFAULT_FONT}' also not found.")
         except Exception as e: print(f"  E: Failed fallback '{FALLBACK_DEFAULT_FONT}': {e}")
     if not font_set: print("W: Using system default font.")
@@ -137,24 +175,15 @@ def main():
     print("---------------------\n")
 
     # Splash Screen (Corrected try/except)
-    splash_icon_path = os.path.join(BASE_PATH, 'assets', 'icons', 'logo.ico'); pix = QPixmap(splash_icon_path) if os.path.exists(splash_icon_path) else QPixmap()
+    app_style = app.style() # Shared by the splash and tray icon fallbacks
+    logo_icon_path = os.path.join(BASE_PATH, 'assets', 'icons', 'logo.ico') # Shared by splash and tray
+    pix = QPixmap(logo_icon_path); logo_loaded = not pix.isNull() # Null pixmap if the file is missing or unreadable
     if pix.isNull():
-        try: standard_icon = app.style().standardIcon(app.style().StandardPixmap.SP_DriveNetIcon); pix = standard_icon.pixmap(128, 128)
+        try: standard_icon = app_style.standardIcon(app_style.StandardPixmap.SP_DriveNetIcon); pix = standard_icon.pixmap(128, 128)
         except Exception as style_e: print(f"W: Std icon: {style_e}"); pix = QPixmap(128, 128); pix.fill(Qt.GlobalColor.lightGray)
-    splash = QSplashScreen(pix); splash.show(); start_time = datetime.now(); min_splash_time = 1.0
-    while (datetime.now() - start_time).total_seconds() < min_splash_time: app.processEvents()
+    splash = QSplashScreen(pix); splash.show(); app.processEvents(); start_time = time.monotonic(); min_splash_time = 1.0
 
-    # System Tray Icon (Corrected try/except)
-    if not QSystemTrayIcon.isSystemTrayAvailable(): print("W: Sys tray not supported."); app.tray_icon = None
-    else:
-         tray_icon_path = os.path.join(BASE_PATH, 'assets', 'icons', 'logo.ico')
-         if os.path.exists(tray_icon_path): tray_icon = QIcon(tray_icon_path)
-         else:
-              try: tray_icon = app.style().standardIcon(app.style().StandardPixmap.SP_ComputerIcon)
-              except Exception as style_e: print(f"W: Std tray icon: {style_e}"); tray_icon = QIcon()
-         if tray_icon.isNull(): print("W: Invalid tray icon.")
-         try: tray = QSystemTrayIcon(tray_icon, parent=app); tray.setToolTip(APP_NAME); tray.show(); app.tray_icon = tray
-         except Exception as tray_e: print(f"E: Could not create/show sys tray: {tray_e}"); app.tray_icon = None
+    app.tray_icon = None # System tray is created after the main window is shown
 
     # Main Window
     try:
@@ -162,8 +191,12 @@ def main():
          from ui.main_window import MainWindow
          print("Initializing MainWindow...")
          window = MainWindow(base_path=BASE_PATH, config=config);
+         # Keep the splash up for the rest of the minimum time without spinning the CPU
+         remaining_ms = int((min_splash_time - (time.monotonic() - start_time)) * 1000)
+         if remaining_ms > 0: splash_loop = QEventLoop(); QTimer.singleShot(remaining_ms, splash_loop.quit); splash_loop.exec()
          print("Showing MainWindow...")
          window.show();
+         QTimer.singleShot(0, lambda: setup_tray(app, logo_icon_path if logo_loaded else None, app_style)) # Not needed for first paint
          splash.finish(window)
          print(f"✅ {APP_NAME} started successfully."); sys.exit(app.exec())
     # Corrected except block
@@ -8,36 +8,145 @@ from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QLabel, QListWidget, QListWidgetItem, QPushButton, QLineEdit,
     QFileDialog, QMessageBox, QHBoxLayout, QVBoxLayout, QInputDialog,
-    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QMenu,
-    QFileIconProvider # Correct icon provider import
+    QTableView, QHeaderView, QAbstractItemView, QMenu,
+    QFileIconProvider, # Correct icon provider import
+    QProgressDialog, QApplication
 )
 from PyQt6.QtGui import QIcon, QAction, QCursor, QDesktopServices
 # Ensure all necessary QtCore classes are imported
 from PyQt6.QtCore import (
-    Qt, QSize, pyqtSignal, QFileInfo, QUrl, QDateTime, QLocale # QLocale is needed
+    Qt, QSize, pyqtSignal, QFileInfo, QUrl, QDateTime, QLocale, # QLocale is needed
+    QAbstractTableModel, QModelIndex, QTimer, QThread
 )
 
 # (BASE_PATH, DATA_DIR, count_attachment_folders_and_files remain the same)
 BASE_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 DATA_DIR = os.path.join(BASE_PATH, 'data', 'attachments')
+# File types whose shell icon is specific to each file, so they are never shared through the icon cache
+PER_FILE_ICON_EXTS = {'.exe', '.lnk', '.ico', '.url'}
+_FOLDER_COUNT_CACHE = {} # list folder path -> (dir st_mtime_ns, file count); a dir's mtime changes whenever entries are added/removed/renamed
 
 def count_attachment_folders_and_files(base_dir):
     folder_count = 0
     total_file_count = 0
     try:
         if os.path.isdir(base_dir):
-            for item_name in os.listdir(base_dir):
-                item_path = os.path.join(base_dir, item_name)
-                if os.path.isdir(item_path):
-                    folder_count += 1
-                    try:
-                        files_in_folder = [f for f in os.listdir(item_path) if os.path.isfile(os.path.join(item_path, f))]
-                        total_file_count += len(files_in_folder)
-                    except Exception: pass
+            with os.scandir(base_dir) as it: list_dirs = {e.path: e.stat().st_mtime_ns for e in it if e.is_dir()}
+            for stale in _FOLDER_COUNT_CACHE.keys() - list_dirs.keys(): del _FOLDER_COUNT_CACHE[stale]
+            for item_path, mtime_ns in list_dirs.items():
+                folder_count += 1
+                cached = _FOLDER_COUNT_CACHE.get(item_path)
+                if cached and cached[0] == mtime_ns: total_file_count += cached[1]; continue # Unchanged folder, skip the rescan
+                try:
+                    with os.scandir(item_path) as it: file_count = sum(1 for e in it if e.is_file()) # Dirent type, no stat per file
+                    _FOLDER_COUNT_CACHE[item_path] = (mtime_ns, file_count); total_file_count += file_count
+                except Exception: pass
     except Exception: pass
     # print(f"Attachment count: {folder_count} lists, {total_file_count} total files")
     return folder_count, total_file_count
 
+class AttachmentCopyWorker(QThread):
+    """ Copies (source, destination) pairs off the GUI thread so large imports don't freeze the window. """
+    progress = pyqtSignal(int, int) # done, total
+    copy_finished = pyqtSignal(int, list) # copied count, error messages
+
+    def __init__(self, copy_pairs, parent=None):
+        super().__init__(parent)
+        self.copy_pairs = copy_pairs
+        self.stop_flag = False
+
+    def stop(self): self.stop_flag = True # Checked between files; a file already being copied is finished
+
+    def run(self):
+        copied = 0; errors = []; total = len(self.copy_pairs)
+        for done, (src_file, dst_file) in enumerate(self.copy_pairs, 1):
+            if self.stop_flag: break
+            try: shutil.copy2(src_file, dst_file); copied += 1
+            except Exception as e: errors.append(f"Could not copy '{os.path.basename(src_file)}': {e}")
+            self.progress.emit(done, total)
+        self.copy_finished.emit(copied, errors)
+
+class AttachmentsModel(QAbstractTableModel):
+    """ Files of one attachment list. Rows are plain lists; size/date text is only formatted when a row is painted. """
+    HEADERS = ["Filename", "Size", "Date Modified"]
+    FETCH_BATCH = 200 # Rows exposed to the view per fetchMore, so huge lists only materialize what is scrolled to
+    SORT_KEYS = (lambda r: r[0].lower(), lambda r: r[2], lambda r: r[3]) # name, size, mtime
+
+    def __init__(self, icon_for, parent=None):
+        super().__init__(parent)
+        self._icon_for = icon_for # callable(path, name) -> QIcon
+        self._all = []; self._rows = [] # [name, path, size, mtime, size_text, date_text]; _rows is the filtered + sorted view
+        self._filter = ""; self._sort_col = 0; self._sort_order = Qt.SortOrder.AscendingOrder; self._locale = QLocale()
+        self._loaded = 0 # Prefix of _rows the view knows about
+
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else self._loaded
+    def columnCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole: return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        row = self._rows[index.row()]; col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0: return row[0]
+            if col == 1:
+                if row[4] is None: size_kb = row[2] / 1024.0; row[4] = f"{size_kb:,.1f} KB" if size_kb >= 0.1 else f"{row[2]} B"
+                return row[4]
+            if row[5] is None: row[5] = self._locale.toString(QDateTime.fromSecsSinceEpoch(int(row[3])), QLocale.FormatType.ShortFormat)
+            return row[5]
+        if role == Qt.ItemDataRole.DecorationRole and col == 0: return self._icon_for(row[1], row[0])
+        if role == Qt.ItemDataRole.TextAlignmentRole: return (Qt.AlignmentFlag.AlignRight if col == 1 else Qt.AlignmentFlag.AlignLeft) | Qt.AlignmentFlag.AlignVCenter
+        if role == Qt.ItemDataRole.UserRole: return row[1]
+        return None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort_col = column; self._sort_order = order
+        self.layoutAboutToBeChanged.emit(); old = self.persistentIndexList(); old_rows = [self._rows[i.row()] for i in old]
+        self._apply_sort(); pos = {id(r): n for n, r in enumerate(self._rows)} # keep selection on the same files
+        self.changePersistentIndexList(old, [self.index(pos[id(r)], i.column()) if pos[id(r)] < self._loaded else QModelIndex() for r, i in zip(old_rows, old)])
+        self.layoutChanged.emit()
+
+    def canFetchMore(self, parent=QModelIndex()): return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid(): return
+        count = min(self.FETCH_BATCH, len(self._rows) - self._loaded)
+        if count <= 0: return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1); self._loaded += count; self.endInsertRows()
+
+    def fetch_all(self):
+        """ Exposes every remaining row at once (for select-all / jump-to-end). """
+        if self.canFetchMore(): self.beginInsertRows(QModelIndex(), self._loaded, len(self._rows) - 1); self._loaded = len(self._rows); self.endInsertRows()
+
+    def _apply_sort(self):
+        self._rows.sort(key=self.SORT_KEYS[self._sort_col], reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
+
+    def _rebuild(self):
+        self.beginResetModel()
+        self._rows = [r for r in self._all if self._filter in r[0].lower()] if self._filter else list(self._all); self._apply_sort()
+        self._loaded = min(self.FETCH_BATCH, len(self._rows)) # The rest streams in via fetchMore as the view scrolls
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        """ Replaces all rows (one model reset), keeping the current filter and sort. """
+        self._all = rows; self._rebuild()
+
+    def set_filter(self, text):
+        self._filter = text.lower(); self._rebuild()
+
+    def path_at(self, row): return self._rows[row][1]
+
+class AttachmentTableView(QTableView):
+    """ Table view whose select-all and Ctrl+End cover rows the model has not fetched yet. """
+    def selectAll(self):
+        self.model().fetch_all(); super().selectAll() # Otherwise Ctrl+A (and "delete selected") stops at the first batch
+
+    def moveCursor(self, cursor_action, modifiers):
+        if cursor_action == QAbstractItemView.CursorAction.MoveEnd and modifiers & Qt.KeyboardModifier.ControlModifier: self.model().fetch_all() # Ctrl+End jumps to the real last file
+        return super().moveCursor(cursor_action, modifiers)
+
 class AttachmentManager(QWidget):
     counts_changed = pyqtSignal(int, int)
 
@@ -46,6 +155,10 @@ class AttachmentManager(QWidget):
         os.makedirs(DATA_DIR, exist_ok=True)
         self.current_list_path = None
         self.icon_provider = QFileIconProvider() # Correct provider
+        self._icon_cache = {} # lowercased extension -> QIcon; one shell lookup per file type
+        self._model = AttachmentsModel(self._file_icon, self)
+        self._copy_worker = None # Running AttachmentCopyWorker, if any
+        QApplication.instance().aboutToQuit.connect(self._stop_copy_worker) # Child widgets get no closeEvent on quit
         self._build_ui()
         self._refresh_list()
 
@@ -83,12 +196,12 @@ class AttachmentManager(QWidget):
         file_action_layout.addStretch(1); right_layout.addLayout(file_action_layout)
         # Search Bar
         self.search_input = QLineEdit(); self.search_input.setPlaceholderText("🔍 Search files in current list..."); self.search_input.textChanged.connect(self._filter_files); right_layout.addWidget(self.search_input)
+        self._filter_timer = QTimer(self); self._filter_timer.setSingleShot(True); self._filter_timer.setInterval(150); self._filter_timer.timeout.connect(self._apply_filter) # Debounce: filter once typing pauses
 
-        # *** Table Widget Setup (Includes Scrolling/Resizing Settings) ***
-        self.file_table = QTableWidget()
+        # *** Table View Setup (Includes Scrolling/Resizing Settings) ***
+        self.file_table = AttachmentTableView()
         self.file_table.setObjectName("attachmentFileTable")
-        self.file_table.setColumnCount(3)
-        self.file_table.setHorizontalHeaderLabels(["Filename", "Size", "Date Modified"])
+        self.file_table.setModel(self._model) # Columns/headers come from the model
         # Explicitly set scrollbar policy
         self.file_table.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.file_table.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
@@ -97,8 +210,9 @@ class AttachmentManager(QWidget):
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch) # Filename stretches
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Interactive) # Size interactive
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive) # Date interactive
+        self.file_table.setColumnWidth(1, 100); self.file_table.setColumnWidth(2, 150) # Once; the header keeps its sections across model resets
         # Other Table Properties
-        self.file_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers); self.file_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows); self.file_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection); self.file_table.setShowGrid(True); self.file_table.verticalHeader().setVisible(False); self.file_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu); self.file_table.customContextMenuRequested.connect(self._show_file_context_menu); self.file_table.setSortingEnabled(True)
+        self.file_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers); self.file_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows); self.file_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection); self.file_table.setShowGrid(True); self.file_table.verticalHeader().setVisible(False); self.file_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu); self.file_table.customContextMenuRequested.connect(self._show_file_context_menu); self.file_table.setSortingEnabled(True); self.file_table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
         right_layout.addWidget(self.file_table)
         # Add panes to main layout
         main_layout.addWidget(left_pane_widget, 1)
@@ -126,7 +240,7 @@ class AttachmentManager(QWidget):
         if self.list_widget.currentItem():
              self._load_list_contents(self.list_widget.currentItem().text())
         else:
-             self.file_table.setRowCount(0)
+             self._model.set_rows([])
              self.current_list_path = None
 
 
@@ -151,19 +265,20 @@ class AttachmentManager(QWidget):
             try:
                 if os.path.isdir(path_to_delete):
                     shutil.rmtree(path_to_delete)
-                    if self.current_list_path == path_to_delete: self.file_table.setRowCount(0); self.current_list_path = None
+                    if self.current_list_path == path_to_delete: self._model.set_rows([]); self.current_list_path = None
                     self._refresh_list(); print(f"Deleted attachment list: {name}") # Refresh updates counts
                 else: QMessageBox.warning(self, "Not Found", f"Directory '{name}' not found."); self._refresh_list()
             except Exception as e: QMessageBox.critical(self, "Error Deleting", f"Could not delete list '{name}':\n{e}")
 
     def _import_files_or_folder(self):
-        """ Imports files/folder with automatic duplicate filename checking. """
+        """ Imports files/folder with automatic duplicate filename checking. Copying runs on a worker thread. """
         if not self.current_list_path or not os.path.isdir(self.current_list_path):
             QMessageBox.warning(self, "Select List", "Please select a valid attachment list first.")
             return
+        if self._copy_worker is not None: QMessageBox.information(self, "Import Running", "Please wait for the current import to finish."); return
 
         try: # Get existing files safely
-            existing_files_lower = {f.lower() for f in os.listdir(self.current_list_path) if os.path.isfile(os.path.join(self.current_list_path, f))}
+            with os.scandir(self.current_list_path) as it: existing_files_lower = {e.name.lower() for e in it if e.is_file()}
         except Exception as e:
             QMessageBox.critical(self,"Error","Could not read current list folder contents.")
             return
@@ -171,83 +286,90 @@ class AttachmentManager(QWidget):
         msgBox = QMessageBox(self); msgBox.setWindowTitle("Import Type"); msgBox.setText("What do you want to import?")
         msgBox.setIcon(QMessageBox.Icon.Question); files_button = msgBox.addButton("Select Files", QMessageBox.ButtonRole.ActionRole); folder_button = msgBox.addButton("Select Folder Contents", QMessageBox.ButtonRole.ActionRole); msgBox.addButton(QMessageBox.StandardButton.Cancel); msgBox.exec()
 
-        imported_count = 0 # Count successfully imported files
-        skipped_duplicates = 0
-
+        src_files = [] # (name, source path)
         if msgBox.clickedButton() == files_button:
             files, _ = QFileDialog.getOpenFileNames(self, "Select Files to Import", "", "All Files (*.*)")
-            if files:
-                for src_file in files:
-                    base_name = os.path.basename(src_file)
-                    if base_name.lower() in existing_files_lower:
-                        print(f"Skipping duplicate file during import: {base_name}")
-                        skipped_duplicates += 1
-                        continue
-                    try:
-                        dst_file = os.path.join(self.current_list_path, base_name)
-                        shutil.copy2(src_file, dst_file)
-                        existing_files_lower.add(base_name.lower()) # Add to set
-                        imported_count += 1
-                    except Exception as e: QMessageBox.warning(self, "Import Error", f"Could not copy file '{base_name}':\n{e}")
-
+            src_files = [(os.path.basename(f), f) for f in files]
         elif msgBox.clickedButton() == folder_button:
             src_folder = QFileDialog.getExistingDirectory(self, "Select Folder to Import Contents From")
             if src_folder:
-                for item_name in os.listdir(src_folder):
-                    src_item = os.path.join(src_folder, item_name)
-                    if os.path.isfile(src_item):
-                        if item_name.lower() in existing_files_lower:
-                            print(f"Skipping duplicate file during import: {item_name}")
-                            skipped_duplicates += 1
-                            continue
-                        try:
-                            dst_item = os.path.join(self.current_list_path, item_name)
-                            shutil.copy2(src_item, dst_item)
-                            existing_files_lower.add(item_name.lower()) # Add to set
-                            imported_count += 1
-                        except Exception as e: QMessageBox.warning(self, "Import Error", f"Could not copy item '{item_name}':\n{e}")
-
-        # Show summary message only if duplicates were skipped
-        if skipped_duplicates > 0:
-            QMessageBox.information(self, "Import Notice", f"Import process finished.\nSuccessfully imported {imported_count} file(s).\nSkipped {skipped_duplicates} file(s) because files with the same name already exist in this list.")
-        elif imported_count > 0:
-             QMessageBox.information(self, "Import Complete", f"Successfully imported {imported_count} file(s).")
+                try:
+                    with os.scandir(src_folder) as it: src_files = [(e.name, e.path) for e in it if e.is_file()]
+                except OSError as e: QMessageBox.warning(self, "Import Error", f"Could not read folder '{src_folder}':\n{e}"); return
+
+        # Duplicate names are skipped up front, so the worker never has to ask anything
+        copy_pairs = []; skipped_duplicates = 0
+        for base_name, src_file in src_files:
+            if base_name.lower() in existing_files_lower:
+                print(f"Skipping duplicate file during import: {base_name}")
+                skipped_duplicates += 1
+                continue
+            existing_files_lower.add(base_name.lower()) # Add to set
+            copy_pairs.append((src_file, os.path.join(self.current_list_path, base_name)))
+
+        if copy_pairs: self._start_copy(copy_pairs, skipped_duplicates)
+        elif skipped_duplicates > 0: self._show_import_summary(0, [], skipped_duplicates)
 
+    def _start_copy(self, copy_pairs, skipped_duplicates):
+        target_dir = self.current_list_path
+        progress = QProgressDialog("Importing attachments...", "Cancel", 0, len(copy_pairs), self); progress.setWindowTitle("Import Files"); progress.setWindowModality(Qt.WindowModality.WindowModal); progress.setMinimumDuration(400); progress.setValue(0) # setValue(minimum) starts the show timer, so only imports running past 400 ms show it
+        worker = AttachmentCopyWorker(copy_pairs, self); self._copy_worker = worker
+        worker.progress.connect(lambda done, total: progress.setValue(done) if not progress.wasCanceled() else None)
+        progress.canceled.connect(worker.stop)
+        worker.copy_finished.connect(lambda copied, errors: self._copy_finished(progress, target_dir, copied, errors, skipped_duplicates))
+        worker.finished.connect(worker.deleteLater)
+        worker.start()
 
+    def _copy_finished(self, progress, target_dir, imported_count, errors, skipped_duplicates):
+        progress.close(); progress.deleteLater(); self._copy_worker = None
+        self._show_import_summary(imported_count, errors, skipped_duplicates)
         if imported_count > 0: # Reload only if something was actually imported
-            self._load_list_contents(os.path.basename(self.current_list_path))
+            if self.current_list_path == target_dir: self._load_list_contents(os.path.basename(target_dir))
             self._update_dashboard_counts()
 
+    def _stop_copy_worker(self):
+        # Finishes the file being copied, then lets the thread exit before it is destroyed
+        if self._copy_worker and self._copy_worker.isRunning(): self._copy_worker.stop(); self._copy_worker.wait()
+
+    def _show_import_summary(self, imported_count, errors, skipped_duplicates):
+        summary = f"Successfully imported {imported_count} file(s)."
+        if skipped_duplicates > 0: summary += f"\nSkipped {skipped_duplicates} file(s) because files with the same name already exist in this list."
+        if errors: QMessageBox.warning(self, "Import Errors", f"Import process finished.\n{summary}\n\nErrors:\n- " + "\n- ".join(errors[:10]) + ("\n..." if len(errors) > 10 else ""))
+        elif skipped_duplicates > 0: QMessageBox.information(self, "Import Notice", f"Import process finished.\n{summary}")
+        elif imported_count > 0: QMessageBox.information(self, "Import Complete", summary)
+
     def _load_list_contents(self, list_name):
         # (Remains the same as previous version with QLocale fix)
-        self.file_table.setRowCount(0)
-        self.search_input.clear()
+        self._model.set_rows([])
+        self.search_input.clear(); self._filter_timer.stop(); self._model.set_filter("") # Apply the cleared filter now, not 150 ms after the load
         if not list_name: self.current_list_path = None; return
         self.current_list_path = os.path.join(DATA_DIR, list_name)
         if not os.path.isdir(self.current_list_path): QMessageBox.warning(self, "Error", f"Selected list folder '{list_name}' not found."); self.current_list_path = None; self._refresh_list(); return
         try:
-            self.file_table.setSortingEnabled(False); files_data = []
-            for filename in os.listdir(self.current_list_path):
-                file_path = os.path.join(self.current_list_path, filename)
-                if os.path.isfile(file_path):
-                    try: stats = os.stat(file_path); file_info = QFileInfo(file_path); files_data.append({'path': file_path, 'name': filename, 'size': stats.st_size, 'modified_ts': stats.st_mtime, 'file_info': file_info})
-                    except OSError as e: print(f"Warning: Could not stat file {filename}: {e}")
-            files_data.sort(key=lambda x: x['name'].lower()); self.file_table.setRowCount(len(files_data)); locale = QLocale()
-            for row, data in enumerate(files_data):
-                icon = self.icon_provider.icon(data['file_info']);
-                if icon.isNull(): icon = QIcon.fromTheme("application-octet-stream", QIcon())
-                filename_item = QTableWidgetItem(data['name']); filename_item.setIcon(icon); filename_item.setFlags(filename_item.flags() & ~Qt.ItemFlag.ItemIsEditable); filename_item.setData(Qt.ItemDataRole.UserRole, data['path']); self.file_table.setItem(row, 0, filename_item)
-                size_kb = data['size'] / 1024.0; size_text = f"{size_kb:,.1f} KB" if size_kb >= 0.1 else f"{data['size']} B"; size_item = QTableWidgetItem(size_text); size_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter); size_item.setFlags(size_item.flags() & ~Qt.ItemFlag.ItemIsEditable); size_item.setData(Qt.ItemDataRole.UserRole + 1, data['size']); self.file_table.setItem(row, 1, size_item)
-                dt_modified = QDateTime.fromSecsSinceEpoch(int(data['modified_ts'])); date_text = locale.toString(dt_modified, QLocale.FormatType.ShortFormat); date_item = QTableWidgetItem(date_text); date_item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter); date_item.setFlags(date_item.flags() & ~Qt.ItemFlag.ItemIsEditable); date_item.setData(Qt.ItemDataRole.UserRole + 1, int(data['modified_ts'])); self.file_table.setItem(row, 2, date_item)
-            self.file_table.setColumnWidth(1, 100); self.file_table.setColumnWidth(2, 150); self.file_table.setSortingEnabled(True)
+            rows = []
+            with os.scandir(self.current_list_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(): stats = entry.stat(); rows.append([entry.name, entry.path, stats.st_size, stats.st_mtime, None, None]) # One stat per file (free on Windows)
+                    except OSError as e: print(f"Warning: Could not stat file {entry.name}: {e}")
+            self._model.set_rows(rows) # Model sorts; text/icons are produced only for painted rows
         except Exception as e: QMessageBox.critical(self, "Error Loading Files", f"Could not load attachments from list '{list_name}':\n{type(e).__name__}: {e}"); print(f"Error loading list contents for {list_name}: {type(e).__name__} - {e}"); self.current_list_path = None
 
+    def _file_icon(self, file_path, filename):
+        """ Returns the shell icon for a file, cached by extension (files without one share the "" key). """
+        ext = os.path.splitext(filename)[1].lower()
+        icon = self._icon_cache.get(ext)
+        if icon is None:
+            icon = self.icon_provider.icon(QFileInfo(file_path))
+            if icon.isNull(): icon = QIcon.fromTheme("application-octet-stream", QIcon())
+            if ext not in PER_FILE_ICON_EXTS: self._icon_cache[ext] = icon
+        return icon
+
     def _filter_files(self, text):
-        # (Remains the same)
-        filter_text = text.lower()
-        for row in range(self.file_table.rowCount()):
-            item = self.file_table.item(row, 0)
-            if item: filename = item.text().lower(); self.file_table.setRowHidden(row, filter_text not in filename)
+        self._filter_timer.start() # Restarted on every keystroke
+
+    def _apply_filter(self):
+        self._model.set_filter(self.search_input.text()) # Filtering happens in the model, so hidden rows are never laid out
 
     # *** Manual Duplicate Removal Method Removed ***
 
@@ -298,12 +420,10 @@ class AttachmentManager(QWidget):
         if not selected_rows or not self.current_list_path: return
         files_to_delete = []; filenames_display = []
         for row_index in [index.row() for index in selected_rows]:
-            item = self.file_table.item(row_index, 0)
-            if item:
-                file_path = item.data(Qt.ItemDataRole.UserRole)
-                if file_path and os.path.exists(file_path):
-                    if file_path not in files_to_delete: files_to_delete.append(file_path); filenames_display.append(os.path.basename(file_path))
-                else: print(f"W: Cannot delete item, path invalid or file missing: {item.text()}")
+            file_path = self._model.path_at(row_index)
+            if file_path and os.path.exists(file_path):
+                if file_path not in files_to_delete: files_to_delete.append(file_path); filenames_display.append(os.path.basename(file_path))
+            else: print(f"W: Cannot delete item, path invalid or file missing: {os.path.basename(file_path)}")
         if not files_to_delete: QMessageBox.information(self,"No Files", "No valid files selected for deletion."); return
         reply = QMessageBox.question(self, "Confirm Delete", f"Delete {len(files_to_delete)} file(s)?\n\n- " + "\n- ".join(filenames_display[:10]) + ("..." if len(filenames_display)>10 else ""), QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
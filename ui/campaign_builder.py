@@ -204,11 +204,12 @@ class CampaignBuilder(QWidget):
         path = os.path.join(DATA_DIR, cat); items = []
         if os.path.isdir(path):
             try:
-                for name in sorted(os.listdir(path)):
-                    full_path = os.path.join(path, name);
+                with os.scandir(path) as it: entries = sorted(it, key=lambda entry: entry.name)
+                for entry in entries: # DirEntry.is_dir() reuses readdir's entry type instead of a stat per name
+                    name = entry.name
                     is_list_file = cat in ('leads', 'smtps') and name.lower().endswith('.xlsx');
                     is_text_file = cat in ('subjects', 'proxies') and name.lower().endswith('.txt');
-                    is_folder = cat in ('messages', 'attachments') and os.path.isdir(full_path)
+                    is_folder = cat in ('messages', 'attachments') and entry.is_dir()
                     if is_list_file or is_text_file: items.append(os.path.splitext(name)[0])
                     elif is_folder: items.append(name)
             except Exception as e: print(f"W: Could not read {cat} list directory: {e}")
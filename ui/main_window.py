@@ -25,6 +25,12 @@ from ui.proxy_manager      import ProxyManager
 from ui.campaign_builder   import CampaignBuilder
 from ui.settings_panel     import SettingsPanel
 
+def _list_subfolders(folderpath: str) -> list:
+    """Returns paths of the folders directly inside folderpath ([] if it is missing)."""
+    try:
+        with os.scandir(folderpath) as it: return [entry.path for entry in it if entry.is_dir()]
+    except FileNotFoundError: return []
+
 # --- StatCard ---
 # (Remains the same - no changes needed here)
 class StatCard(QFrame):
@@ -54,18 +60,22 @@ class DashboardChart(FigureCanvas):
         self.fig, self.ax = plt.subplots(figsize=(6, 3), tight_layout=True); super().__init__(self.fig); self.data_dir = data_dir; self.setParent(parent)
         self.fig.patch.set_alpha(0.0); self.ax.patch.set_alpha(0.0); self.plot()
     def plot(self):
+        # One listing of data_dir tells which category folders exist, instead of an exists() probe per category
+        try:
+            with os.scandir(self.data_dir) as it: present = {entry.name for entry in it if entry.is_dir()}
+        except FileNotFoundError: present = set()
         self.fig.patch.set_alpha(0.0); self.ax.patch.set_alpha(0.0); stats = {
-            'Leads': len(glob.glob(os.path.join(self.data_dir,'leads','*.xlsx'))) if os.path.exists(os.path.join(self.data_dir,'leads')) else 0,
-            'SMTPs': len(glob.glob(os.path.join(self.data_dir,'smtps','*.xlsx'))) if os.path.exists(os.path.join(self.data_dir,'smtps')) else 0,
-            'Subjects': len(glob.glob(os.path.join(self.data_dir,'subjects','*.txt'))) if os.path.exists(os.path.join(self.data_dir,'subjects')) else 0,
+            'Leads': len(glob.glob(os.path.join(self.data_dir,'leads','*.xlsx'))) if 'leads' in present else 0,
+            'SMTPs': len(glob.glob(os.path.join(self.data_dir,'smtps','*.xlsx'))) if 'smtps' in present else 0,
+            'Subjects': len(glob.glob(os.path.join(self.data_dir,'subjects','*.txt'))) if 'subjects' in present else 0,
             # *** NOTE: This chart still counts list folders, not message folders/files ***
             # This chart logic is separate from the StatCard update logic.
             # Fixing the chart requires changing this part specifically if desired.
-            'Messages': len([d for d in os.listdir(os.path.join(self.data_dir,'messages')) if os.path.isdir(os.path.join(self.data_dir,'messages',d))]) if os.path.exists(os.path.join(self.data_dir,'messages')) else 0,
-            'Attachments': len([d for d in os.listdir(os.path.join(self.data_dir,'attachments')) if os.path.isdir(os.path.join(self.data_dir,'attachments',d))]) if os.path.exists(os.path.join(self.data_dir,'attachments')) else 0,
-            'Proxies': len(glob.glob(os.path.join(self.data_dir,'proxies','*.txt'))) if os.path.exists(os.path.join(self.data_dir,'proxies')) else 0 }
+            'Messages': len(_list_subfolders(os.path.join(self.data_dir,'messages'))) if 'messages' in present else 0,
+            'Attachments': len(_list_subfolders(os.path.join(self.data_dir,'attachments'))) if 'attachments' in present else 0,
+            'Proxies': len(glob.glob(os.path.join(self.data_dir,'proxies','*.txt'))) if 'proxies' in present else 0 }
         running = scheduled = 0; campaigns_dir = os.path.join(self.data_dir,'campaigns')
-        if os.path.isdir(campaigns_dir):
+        if 'campaigns' in present:
             for name in os.listdir(campaigns_dir):
                  camp_path = os.path.join(campaigns_dir,name); summary_file = os.path.join(camp_path,'summary.json')
                  if os.path.isdir(camp_path) and os.path.isfile(summary_file):
@@ -119,8 +129,8 @@ class DashboardWidget(QWidget):
         """Counts files directly inside a folder (not recursive)."""
         count = 0;
         try:
-            # Count only files, not subdirectories
-            count = sum(1 for item in os.listdir(folderpath) if os.path.isfile(os.path.join(folderpath, item)))
+            # Count only files, not subdirectories; scandir reuses readdir's entry type instead of a stat per item
+            with os.scandir(folderpath) as it: count = sum(1 for entry in it if entry.is_file())
         except FileNotFoundError: print(f"W: Folder {folderpath}"); pass
         except Exception as e: print(f"W: Folder {os.path.basename(folderpath)}: {e}"); pass
         return count
@@ -136,7 +146,7 @@ class DashboardWidget(QWidget):
             ("smtp.ico", "SMTPs", lambda: (l:=glob.glob(os.path.join(self.data_dir,'smtps','*.xlsx')), sum(self._count_excel_rows(f) for f in l))),
             ("subject.ico", "Subjects", lambda: (l:=glob.glob(os.path.join(self.data_dir,'subjects','*.txt')), sum(self._count_text_lines(f) for f in l))),
             ("message.ico", "Messages", None), # <<< Use None initially, will be updated by signal
-            ("attachment.ico", "Attachments", lambda: (l:=[os.path.join(self.data_dir,'attachments',d) for d in os.listdir(os.path.join(self.data_dir,'attachments')) if os.path.isdir(os.path.join(self.data_dir,'attachments',d))] if os.path.exists(os.path.join(self.data_dir,'attachments')) else [], sum(self._count_folder_items(f) for f in l))), # Attachments still uses _count_folder_items
+            ("attachment.ico", "Attachments", lambda: (l:=_list_subfolders(os.path.join(self.data_dir,'attachments')), sum(self._count_folder_items(f) for f in l))), # Attachments still uses _count_folder_items
             ("proxy.ico", "Proxies", lambda: (l:=glob.glob(os.path.join(self.data_dir,'proxies','*.txt')), sum(self._count_text_lines(f) for f in l))),
         ]
 
@@ -77,7 +77,7 @@ class SettingsPanel(QWidget):
          try:
              os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
              with open(self.config_path, 'w', encoding='utf-8') as f:
-                 json.dump(self.config, f, indent=4)
+                 json.dump(self.config, f, indent=2, ensure_ascii=False) # Same layout as main.save_config
              print(f"Saved '{theme_name}' as default theme.")
          except Exception as e:
              QMessageBox.critical(self, "Config Error", f"Could not save default theme setting:\n{e}")
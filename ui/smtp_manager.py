@@ -205,7 +205,7 @@ class SMTPManager(QWidget):
         if not file_path:
             return
         try:
-            wb = load_workbook(filename=file_path)
+            wb = load_workbook(filename=file_path, read_only=True)
             ws = wb.active
             self.smtp_table.setRowCount(0)
             now_str = QDateTime.currentDateTime().toString("yyyy-MM-dd HH:mm:ss")
@@ -217,6 +217,7 @@ class SMTPManager(QWidget):
                 self.smtp_table.insertRow(row_position)
                 for col_index, value in enumerate(row_data):
                     self.smtp_table.setItem(row_position, col_index, QTableWidgetItem(str(value)))
+            wb.close()
             self.save_smtp_file()
         except Exception as e:
             QMessageBox.critical(self, "Import Error", f"Failed to load file:\n{str(e)}")
@@ -340,7 +341,7 @@ class SMTPManager(QWidget):
     def load_smtp_list(self, item):
         file_path = os.path.join(DATA_DIR, item.text())
         try:
-            wb = load_workbook(filename=file_path)
+            wb = load_workbook(filename=file_path, read_only=True)
             ws = wb.active
             self.smtp_table.setRowCount(0)
             for row in ws.iter_rows(min_row=2, values_only=True):
@@ -350,6 +351,7 @@ class SMTPManager(QWidget):
                 self.smtp_table.insertRow(row_position)
                 for col_index, value in enumerate(row):
                     self.smtp_table.setItem(row_position, col_index, QTableWidgetItem(str(value)))
+            wb.close()
         except Exception as e:
             QMessageBox.critical(self, "Load Error", f"Failed to load SMTP list:\n{str(e)}")
 